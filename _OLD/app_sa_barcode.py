@@ -17,16 +17,59 @@ TODO Lista:
 - [ ] Implementirati multi-language podršku
 """
 
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import mm
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
-from io import BytesIO
+from io import BytesIO, StringIO
+from functools import lru_cache
+from collections import OrderedDict
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import os
+import sys
 from datetime import datetime
-import qrcode
-from pdf417gen import encode, render_image
+from weakref import WeakValueDictionary
+from uuid import uuid4
 import base64
 
+# Razina zlib kompresije za PNG; slike su male pa je brzina važnija od veličine
+PNG_COMPRESS_LEVEL = 1
+
+# Separator između računa u ispisu (uključuje prazan red koji je dodavao print)
+_SEP = "\n" + "=" * 40 + "\n\n"
+
+
+# ReportLab, qrcode, pdf417gen i segno se učitavaju tek kad zatrebaju, tako da
+# import modula (npr. samo za rad s klijentima i računima) ne plaća njihov import.
+@lru_cache(maxsize=1)
+def _get_reportlab():
+    """Vraća (canvas, A4, ImageReader) iz ReportLaba"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.utils import ImageReader
+    return canvas, A4, ImageReader
+
+
+@lru_cache(maxsize=1)
+def _get_qrcode():
+    """Vraća qrcode modul"""
+    import qrcode
+    return qrcode
+
+
+@lru_cache(maxsize=1)
+def _get_pdf417gen():
+    """Vraća (encode, render_image) iz pdf417gen"""
+    from pdf417gen import encode, render_image
+    return encode, render_image
+
+
+@lru_cache(maxsize=1)
+def _get_segno():
+    """Vraća segno modul (brži QR enkoder koji sam piše PNG) ili None ako nije instaliran"""
+    try:
+        import segno
+    except ImportError:
+        return None
+    return segno
+
 
 class Client:
     """
@@ -42,6 +85,9 @@ class Client:
         total_invoices_amount (float): Ukupan iznos svih računa
     """
     
+    # Bez __dict__ po instanci: manje memorije i brži pristup atributima
+    __slots__ = ("first_name", "last_name", "postal_address", "email", "phone", "invoices", "_total_cache")
+    
     def __init__(self, first_name, last_name, postal_address, email, phone):
         self.first_name = first_name
         self.last_name = last_name
@@ -49,7 +95,13 @@ class Client:
         self.email = email
         self.phone = phone
         self.invoices = []
-        self.total_invoices_amount = 0.0
+        # Ukupni iznos se održava inkrementalno (add_invoice, Invoice.add_item)
+        self._total_cache = 0  # u centima
+
+
+    def _without_invoices(self):
+        """Kopija klijenta samo s podacima za prikaz, bez liste računa"""
+        return Client(self.first_name, self.last_name, self.postal_address, self.email, self.phone)
 
 
     def add_invoice(self, invoice):
@@ -66,13 +118,27 @@ class Client:
         """
         # Napraviti provjeru dobivenih podataka!!! I samo ako je sve OK, dodati fakturu
         self.invoices.append(invoice)
-        self.calculate_total_invoices_amount()
+        invoice._owner = self
+        self._total_cache += invoice.total_cents
         # Opcija: Posalji notifikaciju klijentu o novoj fakturi (email, SMS, push notifikacija...)
 
 
+    @property
+    def total_invoices_amount(self):
+        """Ukupan iznos svih računa klijenta (bez ponovnog zbrajanja)"""
+        return self._total_cache / 100
+
+
     def calculate_total_invoices_amount(self):
-        """Izračunava ukupan iznos svih računa klijenta"""
-        self.total_invoices_amount = sum(invoice.total for invoice in self.invoices)
+        """
+        Ponovno zbraja iznose svih računa klijenta
+        
+        Koristiti ako su se računi mijenjali mimo add_invoice/add_item;
+        totali svakog računa se pritom preračunavaju iz njegovih stavki.
+        """
+        for invoice in self.invoices:
+            invoice.subtotal_cents, invoice.tax_cents, invoice.total_cents = invoice.calculate_totals()
+        self._total_cache = sum(invoice.total_cents for invoice in self.invoices)
         return self.total_invoices_amount
 
 
@@ -109,6 +175,8 @@ class PostalAddress:
     - Dodati standardizaciju adresa
     """
     
+    __slots__ = ("street", "house_number", "postal_code", "city", "country")
+    
     def __init__(self, street, house_number, postal_code, city, country):
         self.street = street
         self.house_number = house_number
@@ -132,6 +200,8 @@ class Email:
     - Dodati support za multiple email tipova (work, personal, billing)
     """
     
+    __slots__ = ("email_address", "email_type")
+    
     def __init__(self, email_address, email_type):
         self.email_address = email_address
         self.email_type = email_type  # Work, Personal, Billing
@@ -155,16 +225,19 @@ class PaymentDetails:
         iban (str): IBAN broj bankovnog računa
         model (str): Model plaćanja (HR00, HR01, etc.)
         reference_number (str): Poziv na broj primatelja
-        amount (float): Iznos plaćanja
+        amount_cents (int): Iznos plaćanja u centima
+        amount (float): Iznos plaćanja (izvedeno iz amount_cents, za prikaz)
         receiver_name (str): Naziv primatelja
         purpose (str): Svrha plaćanja
     """
     
-    def __init__(self, iban, model, reference_number, amount, receiver_name, purpose):
+    __slots__ = ("iban", "model", "reference_number", "amount_cents", "receiver_name", "purpose")
+    
+    def __init__(self, iban, model, reference_number, amount_cents, receiver_name, purpose):
         self.iban = iban
         self.model = model
         self.reference_number = reference_number
-        self.amount = amount
+        self.amount_cents = amount_cents
         self.receiver_name = receiver_name
         self.purpose = purpose
     
@@ -191,11 +264,15 @@ class PaymentDetails:
         - Implementirati validaciju svih polja
         - Dodati support za dodatne opcije (hitno plaćanje, itd.)
         """
+        # Iznos se formatira iz apsolutne vrijednosti jer // zaokružuje prema dolje
+        # (-150 // 100 == -2), a predznak ide ispred (npr. za odobrenja)
+        sign, cents = ("-", -self.amount_cents) if self.amount_cents < 0 else ("", self.amount_cents)
+        
         # Format prema HUB3 standardu Hrvatske narodne banke
         hub3_data = (
             f"HRVHUB30\n"
             f"HRK\n"
-            f"{self.amount:.2f}\n"
+            f"{sign}{cents // 100}.{cents % 100:02d}\n"
             f"{self.receiver_name}\n"
             f"{self.iban}\n"
             f"{self.model}\n"
@@ -206,6 +283,179 @@ class PaymentDetails:
             f"{self.purpose}\n"
         )
         return hub3_data
+    
+    
+    @property
+    def amount(self):
+        """Iznos plaćanja u eurima"""
+        return self.amount_cents / 100
+    
+    
+    def replace(self, **changes):
+        """
+        Vraća kopiju s promijenjenim poljima (kao dataclasses.replace)
+        
+        Args:
+            **changes: Polja koja se mijenjaju (npr. reference_number, amount_cents, purpose)
+            
+        Returns:
+            PaymentDetails: Novi objekt; ostala polja su preuzeta iz ovog
+        """
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(changes)
+        return PaymentDetails(**fields)
+    
+    
+    @property
+    def cache_key(self):
+        """
+        Ključ za cache generiranih kodova
+        
+        Returns:
+            tuple: (iban, model, reference_number, amount_cents, receiver_name, purpose)
+        """
+        return (self.iban, self.model, self.reference_number, self.amount_cents, self.receiver_name, self.purpose)
+
+
+
+class _BatchFileWriter:
+    """
+    Skuplja sadržaj više datoteka u memoriji i zapisuje ih u jednoj seriji
+    
+    Svaka datoteka se zapisuje jednim os.write pozivom (uz ponavljanje za
+    djelomične zapise), bez Python file objekta i njegovog međuspremnika.
+    Zapis ide u privremenu datoteku u istom direktoriju koja se zatim
+    atomarno preimenuje (os.replace), pa se nikad ne vidi napola zapisana datoteka.
+    """
+    
+    # O_BINARY postoji samo na Windowsu; bez njega bi se \n prevodio u \r\n
+    _FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+    
+    def __init__(self):
+        self._pending = []
+
+
+    def add(self, path, data):
+        """Dodaje datoteku za zapis (path, bytes)"""
+        self._pending.append((path, data))
+
+
+    def flush(self):
+        """Zapisuje sve dodane datoteke na disk"""
+        for path, data in self._pending:
+            # Privremena datoteka mora biti na istom disku kao cilj da bi os.replace bio atomaran
+            tmp_path = f"{path}.{uuid4().hex}.tmp"
+            fd = os.open(tmp_path, self._FLAGS, 0o644)
+            try:
+                try:
+                    view = memoryview(data)
+                    while view:
+                        view = view[os.write(fd, view):]
+                finally:
+                    os.close(fd)
+                os.replace(tmp_path, path)
+            except OSError:
+                os.unlink(tmp_path)
+                raise
+        self._pending.clear()
+
+
+
+def _make_qr_image(payment_data):
+    """Gradi QR kod (PIL slika) za zadani tekst"""
+    qrcode = _get_qrcode()
+    qr = qrcode.QRCode(
+        version=1,
+        box_size=10,
+        border=4
+    )
+    qr.add_data(payment_data)
+    qr.make(fit=True)
+    
+    return qr.make_image(fill_color="black", back_color="white")
+
+
+def _make_hub3_image(hub3_string):
+    """Gradi HUB3 PDF417 barcode (PIL slika) za zadani HUB3 string"""
+    encode, render_image = _get_pdf417gen()
+    codes = encode(hub3_string, columns=8, security_level=5)
+    return render_image(codes, scale=2, ratio=3)
+
+
+class _PngCache:
+    """
+    Mali LRU cache PNG bajtova koji se može puniti i izvana
+    
+    Za razliku od lru_cache, put() dopušta da glavni proces preuzme PNG-ove
+    koje su generirali radni procesi (export_many_to_pdf), pa ih
+    save_payment_codes ne mora generirati ponovno.
+    """
+    
+    def __init__(self, maxsize=256):
+        self._data = OrderedDict()
+        self._maxsize = maxsize
+        self._lock = threading.Lock()
+
+
+    def get(self, key):
+        """Vraća PNG bajtove za ključ ili None"""
+        with self._lock:
+            png = self._data.get(key)
+            if png is not None:
+                self._data.move_to_end(key)
+            return png
+
+
+    def put(self, key, png):
+        """Sprema PNG bajtove; najstariji zapis ispada kad je cache pun"""
+        with self._lock:
+            self._data[key] = png
+            self._data.move_to_end(key)
+            if len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+
+_qr_png_cache = _PngCache()
+_hub3_png_cache = _PngCache()
+
+
+def _render_qr_png_bytes(payment_data):
+    """Vraća PNG bajtove QR koda; isti sadržaj se generira samo jednom"""
+    png = _qr_png_cache.get(payment_data)
+    if png is not None:
+        return png
+    
+    buffer = BytesIO()
+    segno = _get_segno()
+    if segno is not None:
+        # Iste postavke kao qrcode verzija: razina M, box_size 10, border 4
+        # Eksplicitni UTF-8 kao kod qrcode verzije; bez toga segno tekst koji stane
+        # u ISO-8859-1 kodira tako
+        segno.make_qr(payment_data, error='m', boost_error=False, encoding='utf-8').save(
+            buffer, kind='png', scale=10, border=4, compresslevel=PNG_COMPRESS_LEVEL
+        )
+    else:
+        _make_qr_image(payment_data).save(buffer, format='PNG', compress_level=PNG_COMPRESS_LEVEL)
+    png = buffer.getvalue()
+    _qr_png_cache.put(payment_data, png)
+    return png
+
+
+def _render_hub3_png_bytes(iban, model, reference_number, amount_cents, receiver_name, purpose):
+    """Vraća PNG bajtove HUB3 barcodea; ključ je PaymentDetails.cache_key"""
+    key = (iban, model, reference_number, amount_cents, receiver_name, purpose)
+    png = _hub3_png_cache.get(key)
+    if png is not None:
+        return png
+    
+    payment_details = PaymentDetails(iban, model, reference_number, amount_cents, receiver_name, purpose)
+    buffer = BytesIO()
+    _make_hub3_image(payment_details.generate_hub3_string()).save(
+        buffer, format='PNG', compress_level=PNG_COMPRESS_LEVEL
+    )
+    png = buffer.getvalue()
+    _hub3_png_cache.put(key, png)
+    return png
 
 
 
@@ -220,11 +470,30 @@ class Invoice:
         client (Client): Klijent kojem je račun izdan
         items (list): Lista stavki na računu
         tax_rate (float): Porezna stopa (default 0.25 = 25%)
-        subtotal (float): Osnovica
-        tax (float): Iznos poreza
-        total (float): Ukupan iznos s porezom
+        subtotal_cents (int): Osnovica u centima
+        tax_cents (int): Iznos poreza u centima
+        total_cents (int): Ukupan iznos s porezom u centima
+        subtotal, tax, total (float): Isti iznosi u eurima, za prikaz
+        default_reference (str): Poziv na broj za plaćanje (broj računa + godina)
+        default_purpose (str): Svrha plaćanja za ovaj račun
     """
     
+    __slots__ = (
+        "invoice_number",
+        "invoice_date",
+        "due_date",
+        "client",
+        "items",
+        "tax_rate",
+        "subtotal_cents",
+        "tax_cents",
+        "total_cents",
+        "qr_code",
+        "_owner",
+        "_default_reference",
+        "_default_purpose",
+    )
+    
     def __init__(self, invoice_number, invoice_date, due_date, client, items=[], tax_rate=0.25):
         self.invoice_number = invoice_number
         self.invoice_date = invoice_date
@@ -232,8 +501,11 @@ class Invoice:
         self.client = client
         self.items = items
         self.tax_rate = tax_rate
-        self.subtotal, self.tax, self.total = self.calculate_totals()
+        self.subtotal_cents, self.tax_cents, self.total_cents = self.calculate_totals()
         self.qr_code = 'Ovo je QR Code'  # Placeholder for QR code generation
+        self._owner = None  # Klijent kojem je račun dodan (postavlja Client.add_invoice)
+        self._default_reference = None  # Računa se tek kod prvog pristupa
+        self._default_purpose = None
         
         # TODO: Dodati dodatne atribute
         # self.paid = False
@@ -245,15 +517,41 @@ class Invoice:
 
     def calculate_totals(self):
         """
-        Izračunava osnovicu, porez i ukupan iznos
+        Izračunava osnovicu, porez i ukupan iznos u centima
+        
+        Uvijek kreće od self.items, pa radi i nakon izmjena stavki mimo add_item.
         
         Returns:
-            tuple: (subtotal, tax, total)
+            tuple: (subtotal_cents, tax_cents, total_cents)
         """
-        subtotal = sum(item.total_price for item in self.items)
-        tax = subtotal * self.tax_rate
-        total = subtotal + tax
-        return subtotal, tax, total
+        return self._totals_for_subtotal(sum(item.total_price_cents for item in self.items))
+
+
+    def _totals_for_subtotal(self, subtotal_cents):
+        """Računa porez i ukupan iznos za zadanu osnovicu (sve u centima)"""
+        # Porez se računa cjelobrojno, zaokruženo na cent (pola centa ide gore);
+        # stopa je u baznim bodovima da i stope poput 5,5 % ili 12,5 % budu točne
+        tax_rate_bp = int(round(self.tax_rate * 10000))
+        tax_cents = (subtotal_cents * tax_rate_bp + 5000) // 10000
+        return subtotal_cents, tax_cents, subtotal_cents + tax_cents
+
+
+    @property
+    def subtotal(self):
+        """Osnovica u eurima"""
+        return self.subtotal_cents / 100
+
+
+    @property
+    def tax(self):
+        """Iznos poreza u eurima"""
+        return self.tax_cents / 100
+
+
+    @property
+    def total(self):
+        """Ukupan iznos s porezom u eurima"""
+        return self.total_cents / 100
 
 
     def generate_qr_code(self):
@@ -268,23 +566,52 @@ class Invoice:
         - Implementirati EPC QR standard za SEPA plaćanja
         - Dodati logo u sredinu QR koda
         """
-        payment_data = (
+        return _make_qr_image(self.qr_payment_data())
+
+
+    @property
+    def default_reference(self):
+        """Poziv na broj u obliku '<broj računa>-<godina računa>' (računa se jednom)"""
+        if self._default_reference is None:
+            self._default_reference = f"{self.invoice_number}-{self.invoice_date[:4]}"
+        return self._default_reference
+
+
+    @property
+    def default_purpose(self):
+        """Svrha plaćanja za račun (računa se jednom)"""
+        if self._default_purpose is None:
+            # Bez dijakritika - standardni PDF fontovi (Helvetica) nemaju č/ć
+            self._default_purpose = f"Placanje po racunu {self.invoice_number}"
+        return self._default_purpose
+
+
+    def _render_copy(self):
+        """
+        Kopija računa za slanje u radni proces (export_many_to_pdf)
+        
+        Klijent se zamjenjuje kopijom bez liste računa, a veza na vlasnika se
+        uklanja, pa veličina posla ne ovisi o broju računa klijenta.
+        
+        Returns:
+            Invoice: Plitka kopija s vlastitim (odvojenim) klijentom
+        """
+        copy = Invoice.__new__(Invoice)
+        for name in self.__slots__:
+            setattr(copy, name, getattr(self, name))
+        copy.client = self.client._without_invoices()
+        copy._owner = None
+        return copy
+
+
+    def qr_payment_data(self):
+        """Vraća tekst koji se kodira u QR kod računa"""
+        return (
             f"Invoice: {self.invoice_number}\n"
             f"Amount: {self.total:.2f} €\n"
             f"Due Date: {self.due_date}\n"
             f"Client: {self.client.first_name} {self.client.last_name}"
         )
-        
-        qr = qrcode.QRCode(
-            version=1,
-            box_size=10,
-            border=4
-        )
-        qr.add_data(payment_data)
-        qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="black", back_color="white")
-        return img
 
 
     def generate_hub3_barcode(self, payment_details):
@@ -304,10 +631,7 @@ class Invoice:
         hub3_string = payment_details.generate_hub3_string()
         
         # Generiraj PDF417 barcode prema HUB3 standardu
-        codes = encode(hub3_string, columns=8, security_level=5)
-        image = render_image(codes, scale=2, ratio=3)
-        
-        return image
+        return _make_hub3_image(hub3_string)
 
 
     def save_payment_codes(self, payment_details, qr_filename="qr_code.png", hub3_filename="hub3_barcode.png"):
@@ -324,28 +648,33 @@ class Invoice:
         - Implementirati kompresiju slika
         - Dodati watermark opciju
         """
-        # Spremi QR kod
-        qr_img = self.generate_qr_code()
-        qr_img.save(qr_filename)
+        writer = _BatchFileWriter()
+        
+        # QR i HUB3 se kodiraju istovremeno - zlib kompresija otpušta GIL.
+        # Ako su PNG-ovi već u cacheu (npr. iz export_to_pdf ili export_many_to_pdf),
+        # ovo je samo lookup.
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            qr_future = executor.submit(_render_qr_png_bytes, self.qr_payment_data())
+            hub3_future = executor.submit(_render_hub3_png_bytes, *payment_details.cache_key)
+            writer.add(qr_filename, qr_future.result())
+            writer.add(hub3_filename, hub3_future.result())
         
-        # Spremi HUB3 barcode
-        hub3_img = self.generate_hub3_barcode(payment_details)
-        hub3_img.save(hub3_filename)
+        writer.flush()
         
         print(f"QR kod spremljen kao: {qr_filename}")
         print(f"HUB3 barcode spremljen kao: {hub3_filename}")
 
 
-    def export_to_pdf(self, payment_details, filename=None):
+    def render_pdf(self, payment_details, generated_at=None):
         """
-        Izvozi račun u PDF format s QR i HUB3 kodovima
+        Generira PDF račun s QR i HUB3 kodovima u memoriji
         
         Args:
             payment_details (PaymentDetails): Podaci za plaćanje
-            filename (str): Naziv PDF datoteke
+            generated_at (str): Vrijeme generiranja za footer (default: sada)
             
         Returns:
-            str: Putanja do spremljenog PDF-a
+            bytes: Sadržaj PDF datoteke
             
         TODO:
         - Dodati profesionalni template/logo
@@ -355,11 +684,14 @@ class Invoice:
         - Dodati paginaciju za dugačke račune
         - Implementirati header i footer na svakoj stranici
         """
-        if filename is None:
-            filename = f"Invoice_{self.invoice_number}.pdf"
+        if generated_at is None:
+            generated_at = datetime.now().strftime('%d.%m.%Y %H:%M')
+        
+        canvas, A4, ImageReader = _get_reportlab()
         
         # Kreiraj PDF
-        c = canvas.Canvas(filename, pagesize=A4)
+        pdf_buffer = BytesIO()
+        c = canvas.Canvas(pdf_buffer, pagesize=A4)
         width, height = A4
         
         # === ZAGLAVLJE RAČUNA ===
@@ -448,16 +780,9 @@ class Invoice:
         c.drawString(450, y_position, f"{self.total:.2f} €")
         y_position -= 40
         
-        # === GENERIRAJ KODOVE U MEMORIJI ===
-        qr_img = self.generate_qr_code()
-        qr_buffer = BytesIO()
-        qr_img.save(qr_buffer, format='PNG')
-        qr_buffer.seek(0)
-        
-        hub3_img = self.generate_hub3_barcode(payment_details)
-        hub3_buffer = BytesIO()
-        hub3_img.save(hub3_buffer, format='PNG')
-        hub3_buffer.seek(0)
+        # === GENERIRAJ KODOVE U MEMORIJI (cache dijele export_to_pdf i save_payment_codes) ===
+        qr_buffer = BytesIO(_render_qr_png_bytes(self.qr_payment_data()))
+        hub3_buffer = BytesIO(_render_hub3_png_bytes(*payment_details.cache_key))
         
         # Provjera za novu stranicu ako nema dovoljno prostora za kodove
         if y_position < 200:
@@ -492,39 +817,106 @@ class Invoice:
         
         # === FOOTER ===
         c.setFont("Helvetica", 8)
-        c.drawString(30, 30, f"Generirano: {datetime.now().strftime('%d.%m.%Y %H:%M')}")
+        c.drawString(30, 30, f"Generirano: {generated_at}")
         c.drawString(width - 150, 30, "Hvala na suradnji!")
         
         # TODO: Dodati QR kod za kontakt podatke tvrtke
         # TODO: Dodati link na online payment portal
         
         c.save()
+        return pdf_buffer.getvalue()
+
+
+    def export_to_pdf(self, payment_details, filename=None, generated_at=None):
+        """
+        Izvozi račun u PDF format s QR i HUB3 kodovima
+        
+        Args:
+            payment_details (PaymentDetails): Podaci za plaćanje
+            filename (str): Naziv PDF datoteke
+            generated_at (str): Vrijeme generiranja za footer (default: sada)
+            
+        Returns:
+            str: Putanja do spremljenog PDF-a
+        """
+        if filename is None:
+            filename = f"Invoice_{self.invoice_number}.pdf"
+        
+        writer = _BatchFileWriter()
+        writer.add(filename, self.render_pdf(payment_details, generated_at))
+        writer.flush()
         print(f"PDF račun spremljen kao: {filename}")
         return filename
 
 
-    def print_invoice(self):
+    @classmethod
+    def export_many_to_pdf(cls, jobs):
+        """
+        Izvozi više računa u PDF u jednom pozivu
+        
+        Args:
+            jobs (list): Lista (invoice, payment_details, filename) trojki
+            
+        Returns:
+            list: Putanje do spremljenih PDF-ova, istim redom kao jobs
+        """
+        # Zajednički podaci (npr. vrijeme za footer) računaju se jednom za cijelu seriju
+        generated_at = datetime.now().strftime('%d.%m.%Y %H:%M')
+        # Procesu se šalje samo kopija računa bez ostalih računa klijenta
+        payload = [
+            (invoice._render_copy(), payment_details, filename, generated_at)
+            for invoice, payment_details, filename in jobs
+        ]
+        
+        # Računi su međusobno neovisni, a izvoz je CPU-bound (PNG i PDF kompresija),
+        # pa svaki ide u zaseban proces
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            rendered = list(executor.map(_render_one, payload, chunksize=1))
+        
+        # Procesi samo generiraju PDF-ove, a zapis na disk ide u jednoj seriji na kraju
+        writer = _BatchFileWriter()
+        for (invoice, payment_details, _), (filename, pdf_data, qr_png, hub3_png) in zip(jobs, rendered):
+            writer.add(filename, pdf_data)
+            # Cache radnog procesa se gubi s procesom, pa se njegovi PNG-ovi
+            # prenose u cache glavnog procesa (npr. za save_payment_codes)
+            _qr_png_cache.put(invoice.qr_payment_data(), qr_png)
+            _hub3_png_cache.put(payment_details.cache_key, hub3_png)
+        writer.flush()
+        
+        for filename, *_ in rendered:
+            print(f"PDF račun spremljen kao: {filename}")
+        return [filename for filename, *_ in rendered]
+
+
+    def print_invoice(self, file=None):
         """
         Ispisuje račun u konzolu (za debugging)
         
+        Args:
+            file: Objekt u koji se piše (npr. StringIO); default je sys.stdout.
+                  Cijeli račun se prvo složi u memoriji i zapiše jednim write pozivom.
+        
         TODO:
         - Dodati pretty print formatiranje
         - Implementirati color coding
         """
-        print(f"Invoice Number: {self.invoice_number}")
-        print(f"Invoice Date: {self.invoice_date}")
-        print(f"Due Date: {self.due_date}")
-        print(f"Bill To: {self.client}")
-        print(f"Address: {self.client.postal_address}\n")
-        print(f"Email: {self.client.email}\n")
-        print(f"Phone: {self.client.phone}\n")
-        print("Items:")
+        buffer = StringIO()
+        print(f"Invoice Number: {self.invoice_number}", file=buffer)
+        print(f"Invoice Date: {self.invoice_date}", file=buffer)
+        print(f"Due Date: {self.due_date}", file=buffer)
+        print(f"Bill To: {self.client}", file=buffer)
+        print(f"Address: {self.client.postal_address}\n", file=buffer)
+        print(f"Email: {self.client.email}\n", file=buffer)
+        print(f"Phone: {self.client.phone}\n", file=buffer)
+        print("Items:", file=buffer)
         for item in self.items:
-            print(item)
-        print(f"\nSubtotal: {self.subtotal:.2f} €")
-        print(f"Tax (25%): {self.tax:.2f} €")
-        print(f"Total: {self.total:.2f} €")
-        print("\n[QR Code and HUB3 Barcode available]")
+            print(item, file=buffer)
+        print(f"\nSubtotal: {self.subtotal:.2f} €", file=buffer)
+        print(f"Tax (25%): {self.tax:.2f} €", file=buffer)
+        print(f"Total: {self.total:.2f} €", file=buffer)
+        print("\n[QR Code and HUB3 Barcode available]", file=buffer)
+        
+        (file if file is not None else sys.stdout).write(buffer.getvalue())
 
 
     def add_item(self, item):
@@ -539,8 +931,16 @@ class Invoice:
         - Provjeriti da li stavka već postoji
         - Dodati logging
         """
+        previous_total_cents = self.total_cents
         self.items.append(item)
-        self.subtotal, self.tax, self.total = self.calculate_totals()
+        # Osnovica se samo uveća za novu stavku, bez ponovnog zbrajanja svih stavki
+        self.subtotal_cents, self.tax_cents, self.total_cents = self._totals_for_subtotal(
+            self.subtotal_cents + item.total_price_cents
+        )
+        
+        # Ažuriraj ukupni iznos klijenta samo za razliku, bez zbrajanja svih računa
+        if self._owner is not None:
+            self._owner._total_cache += self.total_cents - previous_total_cents
 
 
     def remove_item(self, item_description):
@@ -567,6 +967,51 @@ class Invoice:
 
 
 
+def _render_one(job):
+    """
+    Generira PDF jednog računa; top-level funkcija da bi se mogla slati u proces
+    
+    Returns:
+        tuple: (filename, pdf_bytes, qr_png, hub3_png) - PNG-ovi su iz cachea
+               radnog procesa i vraćaju se da ih glavni proces ne generira ponovno
+    """
+    invoice, payment_details, filename, generated_at = job
+    pdf_data = invoice.render_pdf(payment_details, generated_at)
+    qr_png = _render_qr_png_bytes(invoice.qr_payment_data())
+    hub3_png = _render_hub3_png_bytes(*payment_details.cache_key)
+    return filename, pdf_data, qr_png, hub3_png
+
+
+
+class _ItemTemplate:
+    """
+    Zajednički (nepromjenjivi) dio stavke: opis i jedinična cijena
+    
+    Iste stavke (npr. "Hosting (12 months)" po 240 €) ponavljaju se na mnogo
+    računa, pa ih sve InvoiceItem instance dijele umjesto da svaka drži svoju kopiju.
+    """
+    
+    __slots__ = ("description", "unit_price_cents", "__weakref__")
+    
+    def __init__(self, description, unit_price_cents):
+        self.description = description
+        self.unit_price_cents = unit_price_cents
+
+
+# Pool predložaka; predložak nestaje kad ga više nijedna stavka ne koristi
+_item_templates = WeakValueDictionary()
+
+
+def _get_item_template(description, unit_price_cents):
+    """Vraća zajednički predložak za (opis, cijena), po potrebi ga kreira"""
+    key = (description, unit_price_cents)
+    template = _item_templates.get(key)
+    if template is None:
+        template = _item_templates[key] = _ItemTemplate(description, unit_price_cents)
+    return template
+
+
+
 class InvoiceItem:
     """
     Klasa za pojedinačnu stavku na računu
@@ -574,15 +1019,19 @@ class InvoiceItem:
     Attributes:
         description (str): Opis proizvoda/usluge
         quantity (int/float): Količina
-        unit_price (float): Jedinična cijena
-        total_price (float): Ukupna cijena stavke
+        unit_price_cents (int): Jedinična cijena u centima
+        total_price_cents (int): Ukupna cijena stavke u centima
+        unit_price, total_price (float): Iste cijene u eurima, za prikaz
     """
     
+    __slots__ = ("_template", "quantity", "total_price_cents")
+    
     def __init__(self, description, quantity, unit_price):
-        self.description = description
+        # Novac se drži u centima da zbrajanje i porez budu točni; opis i cijena
+        # dolaze iz zajedničkog predloška, po stavci se drži samo količina
+        self._template = _get_item_template(description, int(round(unit_price * 100)))
         self.quantity = quantity
-        self.unit_price = unit_price
-        self.total_price = self.calcualte_total_price()
+        self.total_price_cents = self.calcualte_total_price()
         
         # TODO: Dodati dodatne atribute
         # self.unit = "kom"  # komad, sat, m2, kg, itd.
@@ -591,8 +1040,32 @@ class InvoiceItem:
 
 
     def calcualte_total_price(self):
-        """Izračunava ukupnu cijenu stavke"""
-        return self.quantity * self.unit_price
+        """Izračunava ukupnu cijenu stavke u centima"""
+        return int(round(self.quantity * self.unit_price_cents))
+
+
+    @property
+    def description(self):
+        """Opis proizvoda/usluge"""
+        return self._template.description
+
+
+    @property
+    def unit_price_cents(self):
+        """Jedinična cijena u centima"""
+        return self._template.unit_price_cents
+
+
+    @property
+    def unit_price(self):
+        """Jedinična cijena u eurima"""
+        return self.unit_price_cents / 100
+
+
+    @property
+    def total_price(self):
+        """Ukupna cijena stavke u eurima"""
+        return self.total_price_cents / 100
 
 
     def apply_discount(self, discount_percentage):
@@ -661,14 +1134,41 @@ if __name__ == "__main__":
     pero_peric.add_invoice(invoice_1)
     
     
+    # Podaci primatelja su isti za sve račune; po računu se mijenjaju samo
+    # poziv na broj, iznos i svrha
+    payment_template = PaymentDetails(
+        iban="HR1234567890123456789",
+        model="HR00",
+        reference_number="",
+        amount_cents=0,
+        receiver_name="Steel Works d.o.o.",
+        purpose=""
+    )
+    
+    # Jedan prolaz kroz račune: složi ispis za konzolu i poslove za PDF izvoz
+    invoices_text = StringIO()
+    pdf_jobs = []
+    for inv in pero_peric.invoices:
+        inv.print_invoice(file=invoices_text)
+        invoices_text.write(_SEP)
+        
+        # Kreiraj podatke za plaćanje
+        payment_info = payment_template.replace(
+            reference_number=inv.default_reference,
+            amount_cents=inv.total_cents,
+            purpose=inv.default_purpose
+        )
+        pdf_jobs.append((inv, payment_info, f"Racun_{inv.invoice_number}.pdf"))
+    
+    
     # === ISPIS SVIH RAČUNA U KONZOLU ===
     print("\n=== ISPIS SVIH RAČUNA ===\n")
-    for inv in pero_peric.invoices:
-        inv.print_invoice()
-        print("\n" + "="*40 + "\n")
+    sys.stdout.write(invoices_text.getvalue())
+    sys.stdout.flush()
     
     
     # === PRIKAZ UKUPNOG IZNOSA SVIH RAČUNA ===
+    # total_invoices_amount se održava pri dodavanju računa, ne zbraja se ponovno
     print(f"Ukupan iznos svih računa za {pero_peric.first_name} {pero_peric.last_name}:")
     print(f"{pero_peric.total_invoices_amount:.2f} €")
     
@@ -676,32 +1176,18 @@ if __name__ == "__main__":
     # === IZVOZ RAČUNA U PDF ===
     print("\n=== IZVOZ RAČUNA U PDF ===\n")
     
-    for idx, inv in enumerate(pero_peric.invoices):
-        # Kreiraj podatke za plaćanje
-        payment_info = PaymentDetails(
-            iban="HR1234567890123456789",
-            model="HR00",
-            reference_number=f"{inv.invoice_number}-2025",
-            amount=inv.total,
-            receiver_name="Steel Works d.o.o.",
-            purpose=f"Placanje po racunu {inv.invoice_number}"
-        )
-        
-        # Izvezi u PDF
-        pdf_file = inv.export_to_pdf(payment_info, filename=f"Racun_{inv.invoice_number}.pdf")
+    # Izvezi u PDF
+    for idx, pdf_file in enumerate(Invoice.export_many_to_pdf(pdf_jobs)):
         print(f"✓ PDF {idx + 1} kreiran: {pdf_file}")
     
     
     # === SPREMANJE KODOVA KAO SLIKE (OPCIONO) ===
     print("\n=== SPREMANJE QR I HUB3 KODOVA ===\n")
     
-    payment_info = PaymentDetails(
-        iban="HR1234567890123456789",
-        model="HR00",
-        reference_number=f"{invoice.invoice_number}-2024",
-        amount=invoice.total,
-        receiver_name="Steel Works d.o.o.",
-        purpose=f"Plaćanje po računu {invoice.invoice_number}"
+    payment_info = payment_template.replace(
+        reference_number=invoice.default_reference,
+        amount_cents=invoice.total_cents,
+        purpose=invoice.default_purpose
     )
     
     invoice.save_payment_codes(
@@ -1,48 +1,159 @@
-import base64
+import logging
+import multiprocessing
+import os
+import re
+import struct
+import sys
+import threading
+import zlib
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from io import BytesIO
 from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
 import qrcode
+from qrcode.exceptions import DataOverflowError
 import barcode
+from barcode.errors import BarcodeError
 from barcode.writer import ImageWriter
-import pdf417
-from PIL import Image, ImageChops
+from pdf417.compaction import compact
+from pdf417.data import ERROR_CORRECTION_FACTORS
+from pdf417.encoding import encode_rows, get_padding, validate_barcode_size
+from pdf417.util import chunks, to_bytes
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pybase64 as base64  # SIMD base64 (AVX2/NEON), isti API kao base64
+except ImportError:
+    import base64
+
+try:
+    import segno
+except ImportError:  # segno je opcionalan; bez njega QR radi preko qrcode + PIL
+    segno = None
+
+# Razina zlib kompresije za 1-bitne PNG izlaze (QR, PDF417).
+# To su male crno-bijele slike pa razina 1 daje gotovo istu
+# veličinu kao zadana razina 6, a kodiranje je višestruko brže.
+PNG_COMPRESS_LEVEL = 1
+
+# 1D barkod ima antialiasiran tekst (sivi tonovi), pa se na razini 1
+# PNG osjetno poveća; zadana razina 6 je tu i manja i dovoljno brza.
+BARCODE_COMPRESS_LEVEL = 6
+
+# Razina korekcije grešaka za PDF417 (2 => 8 korekcijskih riječi)
+PDF417_SECURITY_LEVEL = 2
+
+# Jedan BytesIO po dretvi za PNG izlaz, umjesto novog po svakom kodu
+_buffers = threading.local()
+
+# Vidljivi modul ("1") je crni piksel, prazni ("0") bijeli
+_MODULE_TO_PIXEL = bytes.maketrans(b"01", b"\xff\x00")
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_PNG_IEND = struct.pack(">I", 0) + b"IEND" + struct.pack(">I", zlib.crc32(b"IEND"))
+
+# Predlošci payloada; polja su odvojena s "\n" i popunjavaju se jednim format() pozivom
+_HUB30_TEMPLATE = (
+    "HRVHUB30\n"  # 1. Identifikator
+    "EUR\n"  # 2. Valuta
+    "{amount:015d}\n"  # 3. Iznos (u centima)
+    "\n"  # 4. Ime platitelja
+    "\n"  # 5. Ulica platitelja
+    "\n"  # 6. broj pošte i mjesto platitelja
+    "{company}\n"  # 7. Naziv primatelja
+    "{street}\n"  # 8. Ulica primatelja
+    "{city}\n"  # 9. Broj pošte i mjesto primatelja
+    "{iban}\n"  # 13. IBAN primatelja
+    "HR00\n"  # 10. Model primatelja
+    "{reference}\n"  # 11. Poziv na broj primatelja
+    "\n"  # 12. Šifra namjene     npr. COST
+    "{description}\n"  # 14. Opis plaćanja
+    ""  # 15. Rezervirano
+)
+
+_BCD_TEMPLATE = (
+    "BCD\n"
+    "002\n"
+    "1\n"
+    "SCT\n"
+    "{bic}\n"
+    "{company}\n"
+    "{iban}\n"
+    "EUR{amount}\n"
+    "\n"
+    "{reference}\n"
+    "\n"
+    "{description}"
+)
+
+_CENT = Decimal("0.01")
+
+_DOC_TYPE_LABELS = {
+    "Sales Invoice": "Račun br.",
+    "Quotation": "Ponuda br.",
+    "Purchase Order": "Narudžba br.",
+    "Delivery Note": "Otpremnica br.",
+}
+
+# Naziv s barem 4 dijela (npr. ACC-SINV-2024-00001) -> 2., 3. i 4. dio
+_REFERENCE_RE = re.compile(r"[^-]*-([^-]*-[^-]*-[^-]*)")
 
 
 class MockDocument:
     """Klasa za simulaciju dokumenta s podacima"""
 
+    __slots__ = (
+        "doctype",
+        "name",
+        "company",
+        "grand_total",
+        "custom_odjel",
+        "iban",
+        "bic",
+    )
+
     def __init__(self, data: dict):
         self.doctype = data.get("doctype", "Sales Invoice")
         self.name = data.get("name", "ACC-SINV-2024-00001")
         self.company = data.get("company", "Moja Tvrtka d.o.o.")
-        self.grand_total = data.get("grand_total", 1500.00)
+        # Iznos se drži kao Decimal da izračun centi ne gubi lipe (npr. 1500.29)
+        self.grand_total = Decimal(str(data.get("grand_total", "1500.00")))
         self.custom_odjel = data.get("custom_odjel", None)
         self.iban = data.get("iban", "HR1234567890123456789")
         self.bic = data.get("bic", "ZABAHR2XXXX")
 
 
-def extract_reference_number(doc_name):
-    """Izdvaja referentni broj iz naziva dokumenta"""
-    parts = doc_name.split("-")
-    if len(parts) >= 4:
-        return f"{parts[1]}-{parts[2]}-{parts[3]}"
-    elif len(parts) >= 3:
-        return "-".join(parts[-3:])
+def _parse_reference_number(doc_name):
+    """Izdvaja referentni broj iz naziva dokumenta (bez cachea)"""
+    match = _REFERENCE_RE.match(doc_name)
+    if match:
+        return match.group(1)
+    elif doc_name.count("-") == 2:
+        return doc_name
     else:
         return doc_name[:10]
 
 
+@lru_cache(maxsize=2048)
+def extract_reference_number(doc_name):
+    """Izdvaja referentni broj iz naziva dokumenta"""
+    return _parse_reference_number(doc_name)
+
+
+def extract_reference_numbers_batch(names):
+    """Izdvaja referentne brojeve za cijelu listu naziva dokumenata"""
+    # Nazivi u seriji su uglavnom jedinstveni, pa bi lru_cache samo dodao trošak
+    return [_parse_reference_number(name) for name in names]
+
+
 def get_document_type_label(doc):
     """Određuje oznaku dokumenta prema tipu"""
-    if hasattr(doc, "doctype"):
-        labels = {
-            "Sales Invoice": "Račun br.",
-            "Quotation": "Ponuda br.",
-            "Purchase Order": "Narudžba br.",
-            "Delivery Note": "Otpremnica br.",
-        }
-        return labels.get(doc.doctype, "Dokument br.")
-    return "Dokument br."
+    return _DOC_TYPE_LABELS.get(doc.doctype, "Dokument br.")
 
 
 def get_iban_by_department(doc):
@@ -56,122 +167,253 @@ def get_iban_by_department(doc):
     # return getattr(doc, 'iban', 'HR0000000000000000000')
 
 
-def generate_hub30_payload(doc):
-    """Generira HUB30 payload za 2D barkod"""
-    iban = get_iban_by_department(doc)
-    poziv_na_broj = extract_reference_number(doc.name)
-    doc_label = get_document_type_label(doc)
-    company = doc.company
+DocView = namedtuple(
+    "DocView", "iban reference label company bic amount_cents amount_eur"
+)
+
+
+def build_doc_view(doc, reference=None):
+    """Jednom po dokumentu izračuna sve podatke potrebne za HUB30 i BCD payload"""
+    if reference is None:
+        reference = extract_reference_number(doc.name)
+    return DocView(
+        iban=get_iban_by_department(doc),
+        reference=reference,
+        label=get_document_type_label(doc),
+        company=doc.company,
+        bic=doc.bic,
+        amount_cents=int((doc.grand_total * 100).to_integral_value(ROUND_HALF_UP)),
+        amount_eur=doc.grand_total.quantize(_CENT, ROUND_HALF_UP),
+    )
 
+
+def build_doc_views(docs):
+    """Gradi DocView za seriju dokumenata s jednim izdvajanjem referenci"""
+    references = extract_reference_numbers_batch([doc.name for doc in docs])
+    return [build_doc_view(doc, ref) for doc, ref in zip(docs, references)]
+
+
+def generate_hub30_payload(view):
+    """Generira HUB30 payload za 2D barkod iz DocView"""
     # Koristi ASCII-safe opis (bez hrvatskih znakova)
-    description = f"Racun br. {poziv_na_broj}"
+    description = f"Racun br. {view.reference}"
     company_street = "Racka 1C"  # Privremeno, može se prilagoditi
     company_postal_code_and_city = "10250 Ježdovec"  # Privremeno, može se prilagoditi
-    lines = [
-        "HRVHUB30",  # 1. Identifikator
-        "EUR",  # 2. Valuta
-        "{:015d}".format(int(doc.grand_total * 100)),  # 3. Iznos (u centima)
-        "",  # 4. Ime platitelja
-        "",  # 5. Ulica platitelja
-        "",  # 6. broj pošte i mjesto platitelja
-        company,  # 7. Naziv primatelja
-        company_street,  # 8. Ulica primatelja
-        company_postal_code_and_city,  # 9. Broj pošte i mjesto primatelja
-        iban,  # 13. IBAN primatelja
-        "HR00",  # 10. Model primatelja
-        poziv_na_broj,  # 11. Poziv na broj primatelja
-        "",  # 12. Šifra namjene     npr. COST
-        description,  # 14. Opis plaćanja
-        "",  # 15. Rezervirano
-    ]
-    return "\n".join(lines)
-
-
-def generate_bcd_payload(doc):
-    """Generira BCD (SEPA) payload za QR kod"""
-    iban = get_iban_by_department(doc)
-    bic = getattr(doc, "bic", "ZABAHR2XXXX")
-    amount = f"EUR{doc.grand_total:.2f}".replace(",", ".")
-    reference = extract_reference_number(doc.name)
-    doc_label = get_document_type_label(doc)
-    description = f"{doc_label} {reference}"
-    company = doc.company
-
-    lines = [
-        "BCD",
-        "002",
-        "1",
-        "SCT",
-        bic,
-        company,
-        iban,
-        amount,
-        "",
-        reference,
-        "",
-        description,
-    ]
-    return "\n".join(lines)
-
-
-def auto_crop_white(img):
-    """Obrezuje bijele rubove slike"""
-    bg = Image.new(img.mode, img.size, "white")
-    diff = ImageChops.difference(img, bg)
-    bbox = diff.getbbox()
-    if bbox:
-        return img.crop(bbox)
-    return img
-
-
-def buffer_to_data_uri(buf: BytesIO) -> str:
-    """Pretvara buffer u data URI"""
-    return f"data:image/png;base64,{base64.b64encode(buf.getvalue()).decode()}"
+    return _HUB30_TEMPLATE.format(
+        amount=view.amount_cents,
+        company=view.company,
+        street=company_street,
+        city=company_postal_code_and_city,
+        iban=view.iban,
+        reference=view.reference,
+        description=description,
+    )
+
+
+def generate_bcd_payload(view):
+    """Generira BCD (SEPA) payload za QR kod iz DocView"""
+    return _BCD_TEMPLATE.format(
+        bic=view.bic,
+        company=view.company,
+        iban=view.iban,
+        amount=view.amount_eur,
+        reference=view.reference,
+        description=f"{view.label} {view.reference}",
+    )
+
+
+def _png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    """Slaže jedan PNG chunk (duljina, tip, podaci, CRC)"""
+    return (
+        struct.pack(">I", len(data))
+        + chunk_type
+        + data
+        + struct.pack(">I", zlib.crc32(data, zlib.crc32(chunk_type)))
+    )
+
+
+def _encode_png_1bit(img) -> bytes:
+    """Kodira crno-bijelu sliku kao 1-bitni sivi PNG bez filtriranja redaka"""
+    img = img.convert("1", dither=Image.Dither.NONE)
+    width, height = img.size
+    # Mod "1" je već spakiran po 8 piksela u bajt, redak poravnat na bajt,
+    # što je točno raspored koji PNG očekuje za bit_depth=1
+    packed = img.tobytes()
+    row_bytes = (width + 7) // 8
+    raw = b"".join(
+        b"\x00" + packed[i : i + row_bytes] for i in range(0, len(packed), row_bytes)
+    )
+    ihdr = struct.pack(">IIBBBBB", width, height, 1, 0, 0, 0, 0)
+    return b"".join(
+        (
+            _PNG_SIGNATURE,
+            _png_chunk(b"IHDR", ihdr),
+            _png_chunk(b"IDAT", zlib.compress(raw, PNG_COMPRESS_LEVEL)),
+            _PNG_IEND,
+        )
+    )
+
+
+def _png_buffer() -> BytesIO:
+    """Vraća ispražnjeni BytesIO koji se ponovno koristi unutar iste dretve"""
+    buf = getattr(_buffers, "png", None)
+    if buf is None:
+        buf = _buffers.png = BytesIO()
+    buf.seek(0)
+    buf.truncate(0)
+    return buf
+
+
+def buffer_to_data_uri(data) -> str:
+    """Pretvara PNG bajtove (bytes ili memoryview) u data URI"""
+    return "data:image/png;base64," + base64.b64encode(data).decode("ascii")
+
+
+@lru_cache(maxsize=None)
+def _rs_product_table(level):
+    """Za svaki temp (0-928) unaprijed izračunati -temp * faktor mod 929"""
+    factors = ERROR_CORRECTION_FACTORS[level]
+    return [tuple(-temp * factor % 929 for factor in factors) for temp in range(929)]
+
+
+# Razina korištena za HUB30 se puni odmah pri importu, ne u prvom pozivu
+_rs_product_table(PDF417_SECURITY_LEVEL)
+
+
+def _compute_error_correction_code_words(data_words, level):
+    """Reed-Solomon korekcijske riječi nad GF(929), isti rezultat kao u pdf417"""
+    products = _rs_product_table(level)
+    count = len(ERROR_CORRECTION_FACTORS[level])
+    ec_words = [0] * count
+    # Raspon je izvučen iz petlje, a registar se pomiče na mjestu
+    shift_range = range(count - 1, 0, -1)
+    for data_word in data_words:
+        product = products[(data_word + ec_words[-1]) % 929]
+        for x in shift_range:
+            ec_words[x] = (ec_words[x - 1] + product[x]) % 929
+        ec_words[0] = product[0]
+    return [-word % 929 for word in reversed(ec_words)]
+
+
+def _pdf417_encode(data: str, columns: int, security_level: int):
+    """Kao pdf417.encode, ali s bržim izračunom korekcijskih riječi"""
+    data_words = list(compact(to_bytes(data), True))
+    ec_count = 2 ** (security_level + 1)
+    padding_words = get_padding(len(data_words), ec_count, columns)
+    validate_barcode_size(len(data_words), ec_count, len(padding_words), columns)
+    words = [len(data_words) + len(padding_words) + 1] + data_words + padding_words
+    words += _compute_error_correction_code_words(words, security_level)
+    return list(encode_rows(list(chunks(words, columns)), columns, security_level))
+
+
+def _render_pdf417(codes, scale, ratio):
+    """Rasterizira PDF417 kodove u sliku (kao pdf417.render_image bez paddinga)"""
+    # Cijeli redak modula gradi se kao niz "0"/"1" i prevodi u piksele odjednom,
+    # umjesto pisanja piksel po piksel kroz image.load()
+    rows = ["".join(format(value, "b") for value in row) for row in codes]
+    width, height = len(rows[0]), len(rows)
+    pixels = "".join(rows).encode("ascii").translate(_MODULE_TO_PIXEL)
+    image = Image.frombytes("L", (width, height), pixels)
+    return image.resize(
+        (scale * width, int(scale * height * ratio)), resample=Image.NEAREST
+    )
+
+
+@lru_cache(maxsize=4096)
+def get_pdf417_png(data: str, scale: int = 3, ratio: float = 2.0) -> bytes:
+    """Generira PDF417 2D barkod kao PNG bajtove"""
+    try:
+        codes = _pdf417_encode(
+            str(data), columns=9, security_level=PDF417_SECURITY_LEVEL
+        )
+        # Bez paddinga je slika već obrezana, pa ne treba rezati bijele rubove
+        image = _render_pdf417(codes, scale, ratio)
+        return _encode_png_1bit(image)
+    except ValueError as e:
+        logger.error("PDF417 greška: %s", e)
+        return b""
 
 
 def get_pdf417(data: str, scale: int = 3, ratio: float = 2.0) -> str:
     """Generira PDF417 2D barkod"""
-    try:
-        codes = pdf417.encode(str(data), columns=9, security_level=2)
-        image = pdf417.render_image(codes, scale=scale, ratio=ratio)
-        image = image.convert("RGB")
-        image = auto_crop_white(image)
-        buf = BytesIO()
-        image.save(buf, format="PNG")
-        return buffer_to_data_uri(buf)
-    except Exception as e:
-        print(f"PDF417 greška: {e}")
-        return ""
-
-
-def get_hub30_pdf417(doc, scale=3, ratio=2):
+    png = get_pdf417_png(data, scale, ratio)
+    return buffer_to_data_uri(png) if png else ""
+
+
+def get_hub30_pdf417_png(view, scale=3, ratio=2):
+    """Generira HUB30 PDF417 barkod kao PNG bajtove"""
+    data = generate_hub30_payload(view)
+    return get_pdf417_png(data, scale, ratio)
+
+
+def get_hub30_pdf417(view, scale=3, ratio=2):
     """Generira HUB30 PDF417 barkod"""
-    data = generate_hub30_payload(doc)
-    return get_pdf417(data, scale=scale, ratio=ratio)
+    data = generate_hub30_payload(view)
+    return get_pdf417(data, scale, ratio)
 
 
-def get_barcode_image(data, barcode_type="code128", module_width=2, module_height=50):
-    """Generira 1D barkod"""
+@lru_cache(maxsize=4096)
+def get_barcode_png(data, barcode_type="code128", module_width=2, module_height=50):
+    """Generira 1D barkod kao PNG bajtove"""
+    if not str(data):
+        # python-barcode za prazan ulaz baca IndexError umjesto BarcodeError
+        logger.error("Greška pri generiranju barkoda: prazan ulaz")
+        return b""
     try:
         cls = barcode.get_barcode_class(barcode_type)
-        code = cls(str(data), writer=ImageWriter())
+        # Barkod je crno-bijel sa sivim tekstom, pa je sivi (L) način bez gubitka,
+        # a PNG je trećina RGB veličine i brže se kodira
+        writer = ImageWriter(mode="L")
+        code = cls(str(data), writer=writer)
         opts = {
             "module_width": module_width,
             "module_height": module_height,
             "quiet_zone": 6.5,
             "font_size": 10,
         }
-        buf = BytesIO()
-        code.write(buf, options=opts)
-        return buffer_to_data_uri(buf)
-    except Exception as e:
-        print(f"Greška pri generiranju barkoda: {e}")
-        return ""
+        # ImageWriter ne prosljeđuje compress_level PIL-u, pa sliku
+        # renderiramo i spremamo sami
+        image = code.render(opts)
+        buf = _png_buffer()
+        image.save(
+            buf,
+            format="PNG",
+            dpi=(writer.dpi, writer.dpi),
+            compress_level=BARCODE_COMPRESS_LEVEL,
+            optimize=False,
+        )
+        return buf.getvalue()
+    except (BarcodeError, OSError, ValueError) as e:
+        logger.error("Greška pri generiranju barkoda: %s", e)
+        return b""
 
 
-def get_qr_code(data, box_size=10, border=1):
-    """Generira QR kod"""
+def get_barcode_image(data, barcode_type="code128", module_width=2, module_height=50):
+    """Generira 1D barkod"""
+    png = get_barcode_png(data, barcode_type, module_width, module_height)
+    return buffer_to_data_uri(png) if png else ""
+
+
+@lru_cache(maxsize=4096)
+def get_qr_code_png(data, box_size=10, border=0) -> bytes:
+    """Generira QR kod kao PNG bajtove"""
     try:
+        if segno is not None:
+            # segno sam piše PNG, bez PIL slike i obrezivanja rubova
+            buf = _png_buffer()
+            # Eksplicitni UTF-8 kao u qrcode putu; bez toga segno tekst koji stane
+            # u ISO-8859-1 kodira tako, a BCD payload deklarira UTF-8 (redak "1")
+            qr = segno.make_qr(
+                str(data), error="m", boost_error=False, encoding="utf-8"
+            )
+            qr.save(
+                buf,
+                kind="png",
+                scale=box_size,
+                border=border,
+                compresslevel=PNG_COMPRESS_LEVEL,
+            )
+            return buf.getvalue()
         qr = qrcode.QRCode(
             error_correction=qrcode.constants.ERROR_CORRECT_M,
             box_size=box_size,
@@ -179,31 +421,106 @@ def get_qr_code(data, box_size=10, border=1):
         )
         qr.add_data(str(data))
         qr.make(fit=True)
-        img = qr.make_image(fill_color="black", back_color="white")
-        img = img.convert("RGB")
-        img = auto_crop_white(img)
-        buf = BytesIO()
-        img.save(buf, format="PNG")
-        return buffer_to_data_uri(buf)
-    except Exception as e:
-        print(f"QR kod greška: {e}")
-        return ""
-
-
-def get_bcd_qr(doc, box_size=5):
+        # Rub je točno border * box_size piksela, pa obrezivanje nije potrebno
+        img = qr.make_image(fill_color="black", back_color="white").get_image()
+        return _encode_png_1bit(img)
+    except (DataOverflowError, ValueError) as e:
+        logger.error("QR kod greška: %s", e)
+        return b""
+
+
+def get_qr_code(data, box_size=10, border=0):
+    """Generira QR kod"""
+    png = get_qr_code_png(data, box_size, border)
+    return buffer_to_data_uri(png) if png else ""
+
+
+def get_bcd_qr_png(view, box_size=5):
+    """Generira BCD QR kod za SEPA plaćanje kao PNG bajtove"""
+    bcd_data = generate_bcd_payload(view)
+    return get_qr_code_png(bcd_data, box_size, 0)
+
+
+def get_bcd_qr(view, box_size=5):
     """Generira BCD QR kod za SEPA plaćanje"""
-    bcd_data = generate_bcd_payload(doc)
-    return get_qr_code(bcd_data, box_size=box_size, border=1)
+    bcd_data = generate_bcd_payload(view)
+    return get_qr_code(bcd_data, box_size, 0)
+
+
+def save_png_to_file(png: bytes, filename: str):
+    """Sprema PNG bajtove direktno u datoteku (bez base64 koraka)"""
+    if png:
+        with open(filename, "wb") as f:
+            f.write(png)
+        logger.info("Slika spremljena: %s", filename)
 
 
 def save_data_uri_to_file(data_uri: str, filename: str):
     """Sprema data URI u datoteku"""
     if data_uri.startswith("data:image/png;base64,"):
         base64_data = data_uri.split(",")[1]
-        image_data = base64.b64decode(base64_data)
-        with open(filename, "wb") as f:
-            f.write(image_data)
-        print(f"Slika spremljena: {filename}")
+        save_png_to_file(base64.b64decode(base64_data), filename)
+
+
+# Radni procesi se ne forkaju iz procesa koji već ima pokrenute dretve
+# (npr. QueueListener), a handler za logove dobivaju preko initializera
+_POOL_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+def start_log_listener():
+    """Pokreće pozadinsku dretvu koja ispisuje logove iz zajedničkog reda"""
+    # Radne dretve i procesi samo stavljaju zapis u red i ne čekaju na stdout
+    log_queue = _POOL_CONTEXT.Queue()
+    _install_log_handler(log_queue)
+    listener = QueueListener(log_queue, logging.StreamHandler(sys.stdout))
+    listener.start()
+    return listener
+
+
+def _install_log_handler(log_queue):
+    """Usmjerava logove ovog modula u zajednički red (i kao initializer poola)"""
+    # Samo logger modula, bez diranja root loggera aplikacije koja nas importa;
+    # prethodni QueueHandler (npr. od ranijeg poziva) se zamjenjuje
+    for handler in [h for h in logger.handlers if isinstance(h, QueueHandler)]:
+        logger.removeHandler(handler)
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def _generate_and_save(task):
+    """Generira jedan kod i sprema ga; task je (generator, ulaz, datoteka)"""
+    generator, source, filename = task
+    save_png_to_file(generator(source), filename)
+
+
+# Generatori koji koriste čisti Python pdf417 enkoder (drži GIL)
+_PDF417_GENERATORS = frozenset({get_pdf417_png, get_hub30_pdf417_png})
+
+
+def generate_codes_batch(tasks, log_queue=None):
+    """
+    Paralelno generira i sprema kodove za listu (generator, ulaz, datoteka)
+
+    log_queue je red iz start_log_listener (listener.queue); bez njega se
+    logovi iz radnih procesa ne ispisuju.
+    """
+    # pdf417 enkoder je čisti Python i drži GIL, pa ide u zasebne procese;
+    # QR i 1D barkod većinu vremena provode u PIL/zlib kodu koji otpušta GIL
+    pdf417_tasks = [t for t in tasks if t[0] in _PDF417_GENERATORS]
+    other_tasks = [t for t in tasks if t[0] not in _PDF417_GENERATORS]
+    pool_kwargs = {"mp_context": _POOL_CONTEXT}
+    if log_queue is not None:
+        pool_kwargs.update(initializer=_install_log_handler, initargs=(log_queue,))
+    with ProcessPoolExecutor(**pool_kwargs) as processes, ThreadPoolExecutor(
+        max_workers=os.cpu_count()
+    ) as threads:
+        futures = [processes.submit(_generate_and_save, t) for t in pdf417_tasks]
+        futures += [threads.submit(_generate_and_save, t) for t in other_tasks]
+        for future in futures:
+            future.result()
 
 
 # Primjer korištenja
@@ -234,42 +551,36 @@ if __name__ == "__main__":
     doc_standard = MockDocument(test_data_standard)
     doc_montaza = MockDocument(test_data_montaza)
 
-    print("Generiranje barkodova za standardni dokument...")
-    print(f"IBAN: {get_iban_by_department(doc_standard)}")
-
-    # Generiraj različite tipove barkodova
-    hub30_barcode = get_hub30_pdf417(doc_standard)
-    bcd_qr = get_bcd_qr(doc_standard)
-    simple_barcode = get_barcode_image(doc_standard.name)
-    simple_qr = get_qr_code(doc_standard.name)
-
-    # Spremi slike
-    if hub30_barcode:
-        save_data_uri_to_file(hub30_barcode, "./_OLD/Barcode/hub30_standard.png")
-    if bcd_qr:
-        save_data_uri_to_file(bcd_qr, "./_OLD/Barcode/bcd_qr_standard.png")
-    if simple_barcode:
-        save_data_uri_to_file(simple_barcode, "./_OLD/Barcode/barcode_standard.png")
-    if simple_qr:
-        save_data_uri_to_file(simple_qr, "./_OLD/Barcode/qr_standard.png")
-
-    print("\nGeneriranje barkodova za Montažu...")
-    print(f"IBAN: {get_iban_by_department(doc_montaza)}")
+    # Pomoćni podaci (IBAN, poziv na broj, iznos...) računaju se jednom po dokumentu
+    view_standard, view_montaza = build_doc_views([doc_standard, doc_montaza])
 
-    # Generiraj za Montažu
-    hub30_montaza = get_hub30_pdf417(doc_montaza)
-    bcd_montaza = get_bcd_qr(doc_montaza)
+    log_listener = start_log_listener()
 
-    if hub30_montaza:
-        save_data_uri_to_file(hub30_montaza, "./_OLD/Barcode/hub30_montaza.png")
-    if bcd_montaza:
-        save_data_uri_to_file(bcd_montaza, "./_OLD/Barcode/bcd_qr_montaza.png")
+    print("Generiranje barkodova za standardni dokument...")
+    print(f"IBAN: {view_standard.iban}")
+    print("\nGeneriranje barkodova za Montažu...")
+    print(f"IBAN: {view_montaza.iban}")
+
+    # Svi kodovi su neovisni, pa se generiraju i spremaju paralelno
+    generate_codes_batch(
+        [
+            (get_hub30_pdf417_png, view_standard, "./_OLD/Barcode/hub30_standard.png"),
+            (get_bcd_qr_png, view_standard, "./_OLD/Barcode/bcd_qr_standard.png"),
+            (get_barcode_png, doc_standard.name, "./_OLD/Barcode/barcode_standard.png"),
+            (get_qr_code_png, doc_standard.name, "./_OLD/Barcode/qr_standard.png"),
+            (get_hub30_pdf417_png, view_montaza, "./_OLD/Barcode/hub30_montaza.png"),
+            (get_bcd_qr_png, view_montaza, "./_OLD/Barcode/bcd_qr_montaza.png"),
+        ],
+        log_listener.queue,
+    )
+
+    log_listener.stop()
 
     print("\nGotovo! Provjerite generirane PNG datoteke.")
 
     # Ispis payloada za provjeru
     print("\n--- HUB30 Payload (Standard) ---")
-    print(generate_hub30_payload(doc_standard))
+    print(generate_hub30_payload(view_standard))
 
     print("\n--- BCD Payload (Montaža) ---")
-    print(generate_bcd_payload(doc_montaza))
+    print(generate_bcd_payload(view_montaza))